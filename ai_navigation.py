@@ -4,18 +4,115 @@ Uses OpenAI Vision API to match user photos with navigation landmarks
 """
 
 import os
+import io
 import base64
+import hashlib
 import json
-from typing import Dict, Optional, List
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
 from pathfinding import NavigationSystem
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, DefaultHttpxClient
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     print("Warning: openai package not installed. Run: pip install openai")
 
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    from rapidfuzz import process, fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Minimum rapidfuzz token_sort_ratio score to accept a fuzzy match without asking the AI
+FUZZY_MATCH_THRESHOLD = 85
+# Best fuzzy match must beat the best other location by this many points
+FUZZY_MATCH_MARGIN = 5
+
+# Vision payloads are bounded to this edge length and re-encoded as JPEG
+VISION_MAX_EDGE = 768
+VISION_JPEG_QUALITY = 80
+# JPEGs smaller than this are sent as-is rather than re-encoded
+VISION_PASSTHROUGH_MAX_BYTES = 60_000
+
+# System prompt for the location-matching AI call
+MATCH_SYSTEM_MSG = "You are a helpful navigation assistant that matches user input to location names. Always respond with the exact location ID or NOT_FOUND."
+
+# Below this size pybase64's dispatch overhead outweighs its SIMD speedup
+PYBASE64_MIN_SIZE = 64
+
+
+def _b64encode(data: bytes) -> str:
+    """Base64-encode bytes, using pybase64 (SIMD) when available"""
+    if PYBASE64_AVAILABLE and len(data) >= PYBASE64_MIN_SIZE:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode('ascii')
+
+
+def _complete_words(text: str) -> str:
+    """Trim partially streamed text back to its last word boundary"""
+    # The trailing word may still be growing (e.g. "Hallway 1" -> "Hallway 10")
+    for i in range(len(text) - 1, -1, -1):
+        if not text[i].isalnum():
+            return text[:i]
+    return ""
+
+
+def _is_word_prefix(prefix: str, text: str) -> bool:
+    """True if text starts with prefix followed by a word boundary"""
+    return len(text) > len(prefix) and text.startswith(prefix) and not text[len(prefix)].isalnum()
+
+
+def _search_tokens(text: str) -> List[str]:
+    """Case-fold, strip diacritics and apostrophes, and split text into word tokens"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.replace("'", "").replace("\u2019", "")
+    return re.findall(r'[^\W_]+', text)
+
+
+# OpenAI clients shared across AINavigationSystem instances, keyed by API key,
+# so warm requests reuse pooled keep-alive connections instead of new TLS handshakes
+_OPENAI_CLIENTS: Dict[str, "OpenAI"] = {}
+
+
+def _make_http_client() -> "DefaultHttpxClient":
+    """Create a pooled HTTP client, using HTTP/2 when the h2 package is installed"""
+    try:
+        return DefaultHttpxClient(http2=True)
+    except ImportError:
+        return DefaultHttpxClient()
+
+
+def _get_openai_client(api_key: str) -> "OpenAI":
+    """Return the shared OpenAI client for this API key, creating it on first use"""
+    client = _OPENAI_CLIENTS.get(api_key)
+    if client is None:
+        client = OpenAI(api_key=api_key, timeout=30, http_client=_make_http_client())
+        _OPENAI_CLIENTS[api_key] = client
+    return client
+
 
 class AINavigationSystem(NavigationSystem):
     """Extended navigation system with AI image recognition"""
@@ -23,6 +120,56 @@ class AINavigationSystem(NavigationSystem):
     def __init__(self, json_file_path: str):
         super().__init__(json_file_path)
         
+        self._suggestion_str = ", ".join(node['name'] for node in self.nodes[:5])
+        
+        # Lowercased names and aliases for local fuzzy matching. Anything with a
+        # digit (room numbers, "Room 01010" style aliases) is left out so
+        # near-miss numbers don't resolve to the wrong room
+        self._name_choices = {}
+        for node in self.nodes:
+            for key in (node['name'], *node.get('aliases', [])):
+                if not any(ch.isdigit() for ch in key):
+                    self._name_choices.setdefault(key.lower(), node['id'])
+        
+        # Fixed location-matching prompt (nodes don't change after load)
+        location_list = '\n'.join([
+            f"- {node['name']} (ID: {node['id']}, Rooms: {', '.join(node.get('rooms', [])) if node.get('rooms') else 'none'})"
+            for node in self.nodes
+        ])
+        self._location_prompt = f"""You are a navigation assistant. Match the user's next message to the correct location from this list.
+
+Available locations in the building:
+{location_list}
+
+Consider:
+- Typos and variations (e.g., "st larry pub" = "St. Larry's Pub")
+- Abbreviations (e.g., "cafe" = "Cafeteria")
+- Partial matches (e.g., "fitness" = "Fitness Center")
+- Natural language descriptions (e.g., "I'm at the stairs", "where the food is")
+- Room numbers if mentioned
+- Common synonyms
+- Printers are inside the Library: if the user asks for "printers", "printer", "where to print", or "I need to print", use location ID: library.
+- ATM is in the Upper Concourse: if the user asks for "ATM", "atm", or "cash machine", use location ID: upper_concourse.
+
+Respond with ONLY the exact location ID from the list above (e.g., "st_larrys_pub", "cafeteria", "fitness_center", "library", "upper_concourse").
+If no good match, respond with "NOT_FOUND"."""
+        
+        # Prefix trie over name/alias tokens; each trie node holds the indices
+        # of every node with a token passing through it
+        self._name_trie = {}
+        for index, node in enumerate(self.nodes):
+            for key in (node['name'], node['id'], *node.get('aliases', [])):
+                for token in _search_tokens(key):
+                    trie_node = self._name_trie
+                    for ch in token:
+                        trie_node = trie_node.setdefault(ch, {})
+                        trie_node.setdefault('', set()).add(index)
+        
+        # Reference photos never change at runtime, so encode them once up front
+        self._ref_photos = self._load_reference_photos()
+        self._ref_name_matcher = self._build_ref_name_matcher()
+        self._ref_prefix_ids = self._build_ref_prefix_ids()
+        
         # Load API key from environment
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
@@ -36,7 +183,7 @@ class AINavigationSystem(NavigationSystem):
                 pass
         
         if api_key and OPENAI_AVAILABLE:
-            self.client = OpenAI(api_key=api_key)
+            self.client = _get_openai_client(api_key)
             self.ai_enabled = True
         else:
             self.client = None
@@ -46,13 +193,31 @@ class AINavigationSystem(NavigationSystem):
             else:
                 print("Warning: OPENAI_API_KEY not found. AI features disabled.")
     
-    def _encode_image(self, image_path: str) -> Optional[str]:
-        """Encode image to base64"""
+    def get_node(self, node_id: str) -> Optional[Dict]:
+        """Get a node's full details by ID"""
+        return self._nodes_by_id.get(node_id)
+    
+    def _prepare_vision_image(self, image_path: str, image_bytes: Optional[bytes] = None) -> Optional[Tuple[bytes, str]]:
+        """Downscale and JPEG-compress an image for the vision model, returning (bytes, mime type)"""
         try:
-            with open(image_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
+            if image_bytes is None:
+                with open(image_path, "rb") as image_file:
+                    image_bytes = image_file.read()
+            
+            # Small JPEGs are already cheap to send; skip the decode/re-encode
+            is_jpeg = image_path.lower().endswith(('.jpg', '.jpeg'))
+            if not PIL_AVAILABLE or (is_jpeg and len(image_bytes) < VISION_PASSTHROUGH_MAX_BYTES):
+                return image_bytes, self._get_image_mime_type(image_path)
+            
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                # The re-encode drops EXIF, so apply its orientation first
+                img = ImageOps.exif_transpose(img).convert('RGB')
+            img.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=VISION_JPEG_QUALITY, optimize=True)
+            return buffer.getvalue(), 'image/jpeg'
         except Exception as e:
-            print(f"Error encoding image {image_path}: {e}")
+            print(f"Error preparing image {image_path}: {e}")
             return None
     
     def _get_image_mime_type(self, image_path: str) -> str:
@@ -67,6 +232,102 @@ class AINavigationSystem(NavigationSystem):
         }
         return mime_types.get(ext, 'image/jpeg')
     
+    def _read_ref_photo(self, photo_path: str) -> Optional[bytes]:
+        """Read a reference photo from disk, or None if it can't be read"""
+        try:
+            with open(photo_path, "rb") as image_file:
+                return image_file.read()
+        except OSError as e:
+            print(f"Error reading image {photo_path}: {e}")
+            return None
+    
+    def _encode_ref_photo(self, photo_path: str, raw: bytes) -> Optional[Dict]:
+        """Downscale and encode one reference photo into its vision payload fields"""
+        prepared = self._prepare_vision_image(photo_path, raw)
+        if not prepared:
+            return None
+        
+        image_bytes, mime_type = prepared
+        nav_image_base64 = _b64encode(image_bytes)
+        return {
+            'image': nav_image_base64,
+            'mime_type': mime_type,
+            'data_url': "data:" + mime_type + ";base64," + nav_image_base64
+        }
+    
+    def _load_reference_photos(self) -> List[Dict]:
+        """Encode every available navigation photo once for reuse in vision prompts"""
+        # Nodes may share a photo path or identical file contents, so each
+        # distinct image is encoded once and its payload strings are shared
+        photo_paths = list(dict.fromkeys(
+            node['photo'] for node in self.nodes if os.path.exists(node['photo'])
+        ))
+        if not photo_paths:
+            return []
+        
+        # Disk reads and encoding overlap well across threads
+        with ThreadPoolExecutor(max_workers=min(16, len(photo_paths))) as executor:
+            raw_photos = list(executor.map(self._read_ref_photo, photo_paths))
+            
+            path_digests = {}
+            unique_photos = {}
+            for photo_path, raw in zip(photo_paths, raw_photos):
+                if raw is None:
+                    continue
+                digest = hashlib.blake2b(raw, digest_size=16).digest()
+                path_digests[photo_path] = digest
+                unique_photos.setdefault(digest, (photo_path, raw))
+            
+            unique_paths = [photo_path for photo_path, _ in unique_photos.values()]
+            unique_raws = [raw for _, raw in unique_photos.values()]
+            payloads = dict(zip(
+                unique_photos,
+                executor.map(self._encode_ref_photo, unique_paths, unique_raws)
+            ))
+        
+        ref_photos = []
+        for node in self.nodes:
+            payload = payloads.get(path_digests.get(node['photo']))
+            if payload:
+                ref_photos.append({'node': node, **payload})
+        return ref_photos
+    
+    def _build_ref_name_matcher(self):
+        """Compile reference photo names into an Aho-Corasick automaton, or None if unavailable"""
+        if not AHOCORASICK_AVAILABLE or not self._ref_photos:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for index, nav_photo in enumerate(self._ref_photos):
+            name = nav_photo['node']['name'].lower()
+            if name not in automaton:
+                automaton.add_word(name, index)
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_ref_prefix_ids(self) -> set:
+        """
+        IDs of reference photos whose name opens a longer one ("Tan Wing" /
+        "Tan Wing Entrance"); these can't end a streamed answer early
+        """
+        ref_names = {nav_photo['node']['name'].lower() for nav_photo in self._ref_photos}
+        return {
+            nav_photo['node']['id'] for nav_photo in self._ref_photos
+            if any(_is_word_prefix(nav_photo['node']['name'].lower(), other) for other in ref_names)
+        }
+    
+    def _find_ref_photo_in_text(self, text: str) -> Optional[Dict]:
+        """Return the first reference photo (in node order) whose location name appears in text"""
+        text = text.lower()
+        if self._ref_name_matcher is not None:
+            indices = [index for _, index in self._ref_name_matcher.iter(text)]
+            return self._ref_photos[min(indices)] if indices else None
+        
+        for nav_photo in self._ref_photos:
+            if nav_photo['node']['name'].lower() in text:
+                return nav_photo
+        return None
+    
     def identify_location_from_photo(self, user_photo_path: str) -> Dict:
         """
         Use AI to identify which navigation location matches the user's photo
@@ -89,32 +350,25 @@ class AINavigationSystem(NavigationSystem):
                 'error': f'Photo not found: {user_photo_path}'
             }
         
-        # Encode user photo
-        user_image_base64 = self._encode_image(user_photo_path)
-        if not user_image_base64:
+        # Navigation photos were validated and encoded at startup, so no
+        # per-request filesystem checks are needed for them
+        navigation_photos = self._ref_photos
+        
+        if not navigation_photos:
             return {
                 'success': False,
-                'error': 'Failed to encode user photo'
+                'error': 'No navigation photos found for comparison'
             }
         
-        # Prepare all navigation photos for comparison
-        navigation_photos = []
-        for node in self.nodes:
-            photo_path = node['photo']
-            if os.path.exists(photo_path):
-                nav_image_base64 = self._encode_image(photo_path)
-                if nav_image_base64:
-                    navigation_photos.append({
-                        'node': node,
-                        'image': nav_image_base64,
-                        'mime_type': self._get_image_mime_type(photo_path)
-                    })
-        
-        if not navigation_photos:
+        # Downscale and encode user photo
+        prepared = self._prepare_vision_image(user_photo_path)
+        if not prepared:
             return {
                 'success': False,
-                'error': 'No navigation photos found for comparison'
+                'error': 'Failed to encode user photo'
             }
+        user_image_bytes, user_mime_type = prepared
+        user_image_base64 = _b64encode(user_image_bytes)
         
         # Create prompt for OpenAI
         location_names = [p['node']['name'] for p in navigation_photos]
@@ -130,58 +384,66 @@ Identify which location the user is currently at. Consider:
 Respond with ONLY the exact location name that best matches, or "UNKNOWN" if none match well."""
 
         try:
-            # Prepare messages with user photo and navigation photos
-            messages = [
+            # Pack the user photo and all reference photos into a single message
+            content = [
+                {"type": "text", "text": prompt},
                 {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{self._get_image_mime_type(user_photo_path)};base64,{user_image_base64}"
-                            }
-                        }
-                    ]
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:{user_mime_type};base64,{user_image_base64}",
+                        "detail": "low"
+                    }
                 }
             ]
-            
-            # Add navigation photos for comparison
             for nav_photo in navigation_photos:
-                messages.append({
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Reference photo for: {nav_photo['node']['name']}"
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{nav_photo['mime_type']};base64,{nav_photo['image']}"
-                            }
-                        }
-                    ]
+                content.append({
+                    "type": "text",
+                    "text": f"Reference photo for: {nav_photo['node']['name']}"
+                })
+                content.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": nav_photo['data_url'],
+                        "detail": "low"
+                    }
                 })
+            messages = [{"role": "user", "content": content}]
             
-            # Call OpenAI Vision API
-            response = self.client.chat.completions.create(
+            # Call OpenAI Vision API, streaming so we can stop at the first matched name
+            stream = self.client.chat.completions.create(
                 model="gpt-4o",  # or "gpt-4-vision-preview"
                 messages=messages,
-                max_tokens=100
+                max_tokens=16,
+                stop=["\n"],
+                stream=True
             )
             
-            identified_location = response.choices[0].message.content.strip()
+            identified_location = ""
+            nav_photo = None
+            try:
+                for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    identified_location += chunk.choices[0].delta.content
+                    nav_photo = self._find_ref_photo_in_text(_complete_words(identified_location))
+                    if nav_photo and nav_photo['node']['id'] not in self._ref_prefix_ids:
+                        break
+            finally:
+                stream.close()
             
-            # Find matching node
-            for nav_photo in navigation_photos:
-                if nav_photo['node']['name'].lower() in identified_location.lower():
-                    return {
-                        'success': True,
-                        'location': nav_photo['node'],
-                        'confidence': identified_location,
-                        'identified_name': identified_location
-                    }
+            identified_location = identified_location.strip()
+            
+            # Find matching node from the full answer (it may end mid-word, or
+            # extend a name that is a prefix of a longer one)
+            if not nav_photo or nav_photo['node']['id'] in self._ref_prefix_ids:
+                nav_photo = self._find_ref_photo_in_text(identified_location)
+            if nav_photo:
+                return {
+                    'success': True,
+                    'location': nav_photo['node'],
+                    'confidence': identified_location,
+                    'identified_name': identified_location
+                }
             
             return {
                 'success': False,
@@ -227,13 +489,66 @@ Respond with ONLY the exact location name that best matches, or "UNKNOWN" if non
                 'error': f'Identified location but recovery failed: {recovery.get("error")}'
             }
     
-    def _match_location_with_ai(self, user_input: str, location_type: str = "location") -> Optional[str]:
+    def trie_search(self, query: str) -> Optional[str]:
+        """
+        Resolve a query by word prefixes (e.g. "libr", "larry pub") without any AI call
+        
+        Every query token must prefix a token of the same location's name, ID or
+        aliases. Returns the node ID only when exactly one location matches.
+        """
+        candidates = None
+        for token in _search_tokens(query):
+            trie_node = self._name_trie
+            for ch in token:
+                trie_node = trie_node.get(ch)
+                if trie_node is None:
+                    return None
+            candidates = trie_node[''] if candidates is None else candidates & trie_node['']
+            if not candidates:
+                return None
+        
+        if candidates and len(candidates) == 1:
+            return self.nodes[next(iter(candidates))]['id']
+        return None
+    
+    def _fuzzy_match_location(self, user_input: str) -> Optional[str]:
+        """Match user input to a location by string similarity, without a network call"""
+        if not RAPIDFUZZ_AVAILABLE or not self._name_choices:
+            return None
+        # Inputs with numbers are room lookups; leave those to the exact index or AI
+        if any(ch.isdigit() for ch in user_input):
+            return None
+        
+        # token_sort_ratio has no partial-match floor, unlike WRatio, so a
+        # shared word ("print", "floor") can't carry a long phrase past the cutoff
+        matches = process.extract(
+            user_input.lower(),
+            self._name_choices.keys(),
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=FUZZY_MATCH_THRESHOLD - FUZZY_MATCH_MARGIN,
+            limit=None
+        )
+        if not matches or matches[0][1] < FUZZY_MATCH_THRESHOLD:
+            return None
+        
+        best_id = self._name_choices[matches[0][0]]
+        # Ambiguous between two locations: let the AI (or "not found") decide
+        for choice, score, _ in matches[1:]:
+            if self._name_choices[choice] != best_id:
+                if matches[0][1] - score < FUZZY_MATCH_MARGIN:
+                    return None
+                break
+        return best_id
+    
+    def _ai_resolve_location(self, user_input: str) -> Optional[str]:
         """
         Use AI to match user input to available locations
         
+        The system message and location list form a fixed prompt prefix so
+        OpenAI's automatic prompt caching applies; only the user input varies.
+        
         Args:
             user_input: What the user typed (e.g., "st larry pub", "cafeteria")
-            location_type: "start" or "destination" for better context
         
         Returns:
             Node ID if matched, None otherwise
@@ -241,49 +556,17 @@ Respond with ONLY the exact location name that best matches, or "UNKNOWN" if non
         if not self.ai_enabled:
             return None
         
-        # Get all available locations
-        available_locations = []
-        for node in self.nodes:
-            available_locations.append({
-                'name': node['name'],
-                'id': node['id'],
-                'rooms': node.get('rooms', []),
-                'type': node.get('type', '')
-            })
-        
-        # Create location list for AI
-        location_list = '\n'.join([
-            f"- {loc['name']} (ID: {loc['id']}, Rooms: {', '.join(loc['rooms']) if loc['rooms'] else 'none'})"
-            for loc in available_locations
-        ])
-        
-        prompt = f"""You are a navigation assistant. The user said: "{user_input}"
-
-Available locations in the building:
-{location_list}
-
-Your task: Match the user's input to the correct location from the list above.
-Consider:
-- Typos and variations (e.g., "st larry pub" = "St. Larry's Pub")
-- Abbreviations (e.g., "cafe" = "Cafeteria")
-- Partial matches (e.g., "fitness" = "Fitness Center")
-- Room numbers if mentioned
-- Common synonyms
-- Printers are inside the Library: if the user asks for "printers", "printer", "where to print", or "I need to print", use location ID: library.
-- ATM is in the Upper Concourse: if the user asks for "ATM", "atm", or "cash machine", use location ID: upper_concourse.
-
-Respond with ONLY the exact location ID from the list above (e.g., "st_larrys_pub", "cafeteria", "fitness_center", "library", "upper_concourse").
-If no good match, respond with "NOT_FOUND"."""
-
         try:
             response = self.client.chat.completions.create(
                 model="gpt-4o",
                 messages=[
-                    {"role": "system", "content": "You are a helpful navigation assistant that matches user input to location names. Always respond with the exact location ID or NOT_FOUND."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": MATCH_SYSTEM_MSG},
+                    {"role": "user", "content": self._location_prompt},
+                    {"role": "user", "content": user_input}
                 ],
-                max_tokens=50,
-                temperature=0.3
+                max_tokens=16,
+                stop=["\n"],
+                temperature=0
             )
             
             matched_id = response.choices[0].message.content.strip()
@@ -292,9 +575,8 @@ If no good match, respond with "NOT_FOUND"."""
                 return None
             
             # Verify the ID exists
-            for node in self.nodes:
-                if node['id'] == matched_id:
-                    return matched_id
+            if matched_id in self._nodes_by_id:
+                return matched_id
             
             return None
         except Exception as e:
@@ -314,33 +596,37 @@ If no good match, respond with "NOT_FOUND"."""
             Dictionary with path and AI-generated instructions
         """
         # Try direct lookup first (fast, reliable)
-        start_id = self.find_node_by_room(start_location) or self.find_node_by_name(start_location)
+        start_id = self._resolve_destination(start_location)
+        
+        # Then local prefix and fuzzy matching, which avoid most AI calls
+        if not start_id and use_ai:
+            start_id = self.trie_search(start_location) or self._fuzzy_match_location(start_location)
         
-        # If not found and AI is enabled, use AI to match
+        # If still not found and AI is enabled, use AI to match
         if not start_id and use_ai and self.ai_enabled:
-            start_id = self._match_location_with_ai(start_location, "start")
+            start_id = self._ai_resolve_location(start_location)
         
         if not start_id:
-            # Get suggestions
-            suggestions = [node['name'] for node in self.nodes[:5]]
             return {
                 'success': False,
-                'error': f'Could not find start location: "{start_location}". Try: {", ".join(suggestions)}, etc.'
+                'error': f'Could not find start location: "{start_location}". Try: {self._suggestion_str}, etc.'
             }
         
         # Try direct lookup first for destination
-        destination_id = self.find_node_by_room(destination) or self.find_node_by_name(destination)
+        destination_id = self._resolve_destination(destination)
         
-        # If not found and AI is enabled, use AI to match
+        # Then local prefix and fuzzy matching, which avoid most AI calls
+        if not destination_id and use_ai:
+            destination_id = self.trie_search(destination) or self._fuzzy_match_location(destination)
+        
+        # If still not found and AI is enabled, use AI to match
         if not destination_id and use_ai and self.ai_enabled:
-            destination_id = self._match_location_with_ai(destination, "destination")
+            destination_id = self._ai_resolve_location(destination)
         
         if not destination_id:
-            # Get suggestions
-            suggestions = [node['name'] for node in self.nodes[:5]]
             return {
                 'success': False,
-                'error': f'Could not find destination: "{destination}". Try: {", ".join(suggestions)}, etc.'
+                'error': f'Could not find destination: "{destination}". Try: {self._suggestion_str}, etc.'
             }
         
         if start_id == destination_id:
@@ -350,29 +636,27 @@ If no good match, respond with "NOT_FOUND"."""
             }
         
         # Find path using BFS
-        path = self.find_path_bfs(start_id, destination_id)
+        path = self._compute_path(start_id, destination_id, False)
         
         if not path:
             return {
                 'success': False,
                 'error': f'No path found from {start_location} to {destination}'
             }
+        path = list(path)
         
         # Get full node details for path
-        path_nodes = []
-        for node_id in path:
-            node = next((n for n in self.nodes if n['id'] == node_id), None)
-            if node:
-                path_nodes.append(node)
+        path_nodes = [self._nodes_by_id[node_id] for node_id in path]
+        photos = [node['photo'] for node in path_nodes]
         
-        start_node = next((n for n in self.nodes if n['id'] == start_id), None)
-        dest_node = next((n for n in self.nodes if n['id'] == destination_id), None)
+        start_node = self._nodes_by_id[start_id]
+        dest_node = self._nodes_by_id[destination_id]
         
         result = {
             'success': True,
             'path': path,
             'path_nodes': path_nodes,
-            'photos': [node['photo'] for node in path_nodes],
+            'photos': photos,
             'start': start_node,
             'destination': dest_node
         }
@@ -384,77 +668,6 @@ If no good match, respond with "NOT_FOUND"."""
         
         return result
     
-    def _understand_location_with_ai(self, location_text: str, is_start: bool = False) -> Optional[str]:
-        """
-        Use AI to understand natural language location descriptions
-        
-        Args:
-            location_text: Natural language description
-            is_start: True if this is the start location
-        
-        Returns:
-            Node ID if found, None otherwise
-        """
-        if not self.ai_enabled:
-            return None
-        
-        # First try direct lookup
-        node_id = self.find_node_by_room(location_text) or self.find_node_by_name(location_text)
-        if node_id:
-            return node_id
-        
-        # Get all available locations
-        available_locations = []
-        for node in self.nodes:
-            available_locations.append({
-                'name': node['name'],
-                'id': node['id'],
-                'rooms': node.get('rooms', []),
-                'type': node.get('type', '')
-            })
-        
-        # Create prompt for AI
-        location_list = '\n'.join([f"- {loc['name']} (rooms: {', '.join(loc['rooms']) if loc['rooms'] else 'none'})" 
-                                  for loc in available_locations])
-        
-        prompt = f"""You are a navigation assistant. The user said: "{location_text}"
-
-Available locations in the building:
-{location_list}
-
-Determine which location the user is referring to. Consider:
-- Room numbers mentioned (e.g., "101", "room 102")
-- Location names (e.g., "library", "cafeteria", "main entrance")
-- Natural language descriptions (e.g., "I'm at the stairs", "where the food is")
-- Partial matches and synonyms
-- Printers are inside the Library: if the user asks for printers, printer, or where to print, respond with "Library".
-- ATM is in the Upper Concourse: if the user asks for ATM, atm, or cash machine, respond with "Upper Concourse".
-
-Respond with ONLY the exact location name from the list above, or "NOT_FOUND" if none match."""
-
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a helpful navigation assistant. Be precise and match locations exactly."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=50
-            )
-            
-            ai_response = response.choices[0].message.content.strip()
-            
-            # Find matching node
-            for loc in available_locations:
-                if loc['name'].lower() in ai_response.lower() or ai_response.lower() in loc['name'].lower():
-                    return loc['id']
-            
-            return None
-            
-        except Exception as e:
-            print(f"AI location understanding error: {e}")
-            return None
-    
     def _generate_ai_instructions(self, path_nodes: List[Dict], start_node: Dict, dest_node: Dict) -> str:
         """Generate simple, concise AI instructions for the path"""
         # Build path with descriptions and floor information
@@ -521,7 +734,8 @@ Provide the directions now (describe what they'll see, use natural language, no
                     {"role": "system", "content": "You are a helpful indoor navigation assistant. Provide simple, clear directions in 2-3 sentences as a paragraph."},
                     {"role": "user", "content": instructions_prompt}
                 ],
-                max_tokens=200
+                max_tokens=200,
+                stop=["\n\n\n"]
             )
             
             return response.choices[0].message.content.strip()
@@ -1,43 +1,55 @@
 """
 Vercel serverless function for getting destinations
 """
-import json
 import os
 import sys
+import hashlib
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
+
+# Repo root holds ai_navigation/pathfinding; only add it when the runtime hasn't
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 from ai_navigation import AINavigationSystem
 
-nav_system = None
+json_path = os.path.join(ROOT_DIR, 'navigation_data.json')
+nav_system = AINavigationSystem(json_path)
 
-def handler(request):
-    global nav_system
-    if nav_system is None:
-        json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'navigation_data.json')
-        nav_system = AINavigationSystem(json_path)
-    
-    headers = {
-        'Content-Type': 'application/json',
+# Destinations only change with the data file, so serialize once and let the edge cache it
+DESTINATIONS_BODY = orjson.dumps({'success': True, 'destinations': nav_system.get_available_destinations()})
+DESTINATIONS_ETAG = 'W/"%s"' % hashlib.blake2b(DESTINATIONS_BODY, digest_size=16).hexdigest()
+DESTINATIONS_BODY = DESTINATIONS_BODY.decode()
+
+# Response headers shared by every invocation
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Cache-Control': 'public, max-age=3600, stale-while-revalidate=86400',
+    'ETag': DESTINATIONS_ETAG
+}
+
+# Browser preflight answer; Max-Age lets the browser skip it for a day
+PREFLIGHT_RESPONSE = {
+    'statusCode': 204,
+    'headers': {
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'GET, OPTIONS',
         'Access-Control-Allow-Headers': 'Content-Type',
-        'Cache-Control': 'no-cache, no-store, must-revalidate'
-    }
-    
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': ''
+}
+
+def handler(request):
     if request.method == 'OPTIONS':
-        return {'statusCode': 200, 'headers': headers, 'body': ''}
+        return PREFLIGHT_RESPONSE
+    
+    request_headers = getattr(request, 'headers', None) or {}
+    if DESTINATIONS_ETAG in request_headers.get('If-None-Match', ''):
+        return {'statusCode': 304, 'headers': HEADERS, 'body': ''}
     
-    try:
-        destinations = nav_system.get_available_destinations()
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps({'success': True, 'destinations': destinations})
-        }
-    except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({'success': False, 'error': str(e)})
-        }
+    return {'statusCode': 200, 'headers': HEADERS, 'body': DESTINATIONS_BODY}
 
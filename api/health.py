@@ -1,31 +1,36 @@
 """
 Vercel serverless function for health check
 """
-import json
 import os
 import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
+
+# Repo root holds ai_navigation/pathfinding; only add it when the runtime hasn't
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 from ai_navigation import AINavigationSystem
 
-nav_system = None
+json_path = os.path.join(ROOT_DIR, 'navigation_data.json')
+nav_system = AINavigationSystem(json_path)
+
+def _body(obj) -> str:
+    """Serialize a JSON response body with orjson"""
+    return orjson.dumps(obj).decode()
+
+# Response headers shared by every invocation
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Cache-Control': 'no-cache, no-store, must-revalidate'
+}
 
 def handler(request):
-    global nav_system
-    if nav_system is None:
-        json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'navigation_data.json')
-        nav_system = AINavigationSystem(json_path)
-    
-    headers = {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': '*',
-        'Cache-Control': 'no-cache, no-store, must-revalidate'
-    }
-    
     return {
         'statusCode': 200,
-        'headers': headers,
-        'body': json.dumps({
+        'headers': HEADERS,
+        'body': _body({
             'status': 'ok',
             'ai_enabled': nav_system.ai_enabled
         })
@@ -1,50 +1,59 @@
 """
 Vercel serverless function for navigation
 """
-import json
 import os
 import sys
 
-# Add parent directory to path to import modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import orjson
 
+# Repo root holds ai_navigation/pathfinding; only add it when the runtime hasn't
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 from ai_navigation import AINavigationSystem
 
-# Initialize navigation system (loaded once per container)
-nav_system = None
+# Initialize navigation system at import (loaded once per container, during cold start)
+json_path = os.path.join(ROOT_DIR, 'navigation_data.json')
+nav_system = AINavigationSystem(json_path)
 
-def handler(request):
-    """Vercel serverless function handler"""
-    global nav_system
-    
-    # Lazy load navigation system
-    if nav_system is None:
-        json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'navigation_data.json')
-        nav_system = AINavigationSystem(json_path)
-    
-    # Handle CORS
-    headers = {
-        'Content-Type': 'application/json',
+def _body(obj) -> str:
+    """Serialize a JSON response body with orjson"""
+    return orjson.dumps(obj).decode()
+
+# Constant error bodies, serialized once
+ERR_START_REQUIRED = _body({'success': False, 'error': 'Start location required'})
+ERR_DESTINATION_REQUIRED = _body({'success': False, 'error': 'Destination required'})
+
+# Response headers shared by every invocation
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Cache-Control': 'no-cache, no-store, must-revalidate'
+}
+
+# Browser preflight answer; Max-Age lets the browser skip it for a day
+PREFLIGHT_RESPONSE = {
+    'statusCode': 204,
+    'headers': {
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'POST, OPTIONS',
         'Access-Control-Allow-Headers': 'Content-Type',
-        'Cache-Control': 'no-cache, no-store, must-revalidate'
-    }
-    
-    # Handle preflight
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': ''
+}
+
+def handler(request):
+    """Vercel serverless function handler"""
     if request.method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': ''
-        }
+        return PREFLIGHT_RESPONSE
     
     try:
         # Get request body
         body_str = request.body if hasattr(request, 'body') else ''
-        if isinstance(body_str, bytes):
-            body_str = body_str.decode('utf-8')
-        body = json.loads(body_str) if body_str else {}
+        body = orjson.loads(body_str) if body_str else {}
         
         start_location = body.get('start_location', '')
         destination = body.get('destination', '')
@@ -53,28 +62,28 @@ def handler(request):
         if not start_location:
             return {
                 'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({'success': False, 'error': 'Start location required'})
+                'headers': HEADERS,
+                'body': ERR_START_REQUIRED
             }
         
         if not destination:
             return {
                 'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({'success': False, 'error': 'Destination required'})
+                'headers': HEADERS,
+                'body': ERR_DESTINATION_REQUIRED
             }
         
         result = nav_system.navigate_from_to(start_location, destination, use_ai=use_ai)
         
         return {
             'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps(result)
+            'headers': HEADERS,
+            'body': _body(result)
         }
     except Exception as e:
         return {
             'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({'success': False, 'error': str(e)})
+            'headers': HEADERS,
+            'body': _body({'success': False, 'error': str(e)})
         }
 
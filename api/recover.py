@@ -1,56 +1,74 @@
 """
 Vercel serverless function for recovery
 """
-import json
 import os
 import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
+
+# Repo root holds ai_navigation/pathfinding; only add it when the runtime hasn't
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 from ai_navigation import AINavigationSystem
 
-nav_system = None
+json_path = os.path.join(ROOT_DIR, 'navigation_data.json')
+nav_system = AINavigationSystem(json_path)
 
-def handler(request):
-    global nav_system
-    if nav_system is None:
-        json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'navigation_data.json')
-        nav_system = AINavigationSystem(json_path)
-    
-    headers = {
-        'Content-Type': 'application/json',
+def _body(obj) -> str:
+    """Serialize a JSON response body with orjson"""
+    return orjson.dumps(obj).decode()
+
+# Constant error bodies, serialized once
+ERR_LANDMARK_REQUIRED = _body({'success': False, 'error': 'Landmark required'})
+
+# Response headers shared by every invocation
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Cache-Control': 'no-cache, no-store, must-revalidate'
+}
+
+# Browser preflight answer; Max-Age lets the browser skip it for a day
+PREFLIGHT_RESPONSE = {
+    'statusCode': 204,
+    'headers': {
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'POST, OPTIONS',
         'Access-Control-Allow-Headers': 'Content-Type',
-        'Cache-Control': 'no-cache, no-store, must-revalidate'
-    }
-    
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': ''
+}
+
+def handler(request):
     if request.method == 'OPTIONS':
-        return {'statusCode': 200, 'headers': headers, 'body': ''}
+        return PREFLIGHT_RESPONSE
     
     try:
         body_str = request.body if hasattr(request, 'body') else ''
-        if isinstance(body_str, bytes):
-            body_str = body_str.decode('utf-8')
-        body = json.loads(body_str) if body_str else {}
+        body = orjson.loads(body_str) if body_str else {}
         landmark = body.get('landmark', '')
         
         if not landmark:
             return {
                 'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({'success': False, 'error': 'Landmark required'})
+                'headers': HEADERS,
+                'body': ERR_LANDMARK_REQUIRED
             }
         
         result = nav_system.recover_from_landmark(landmark)
         return {
             'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps(result)
+            'headers': HEADERS,
+            'body': _body(result)
         }
     except Exception as e:
         return {
             'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({'success': False, 'error': str(e)})
+            'headers': HEADERS,
+            'body': _body({'success': False, 'error': str(e)})
         }
 
@@ -1,76 +1,115 @@
 """
 Vercel serverless function for AI search
 """
-import json
 import os
 import sys
+from functools import lru_cache
+from typing import Tuple
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
+
+# Repo root holds ai_navigation/pathfinding; only add it when the runtime hasn't
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 from ai_navigation import AINavigationSystem
 
-nav_system = None
+json_path = os.path.join(ROOT_DIR, 'navigation_data.json')
+nav_system = AINavigationSystem(json_path)
 
-def handler(request):
-    global nav_system
-    if nav_system is None:
-        json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'navigation_data.json')
-        nav_system = AINavigationSystem(json_path)
+def _body(obj) -> str:
+    """Serialize a JSON response body with orjson"""
+    return orjson.dumps(obj).decode()
+
+# Constant error bodies, serialized once
+ERR_QUERY_REQUIRED = _body({'success': False, 'error': 'Search query required'})
+
+# Ordered (predicate, lookup) stages tried for a search query; first hit wins
+SEARCH_RESOLVERS = (
+    (str.isdigit, nav_system._room_to_id.get),
+    (None, nav_system.find_node_by_name),
+    (None, nav_system.trie_search),
+    (None, nav_system._ai_resolve_location),
+)
+
+class _SearchMiss(Exception):
+    """No location matched a search query"""
+
+@lru_cache(maxsize=4096)
+def _resolve_search(query_norm: str) -> Tuple[str, str, str]:
+    """
+    Resolve a normalized search query to (node_id, name, type)
+    
+    Raises _SearchMiss when nothing matches. lru_cache doesn't cache
+    exceptions, so only successful lookups are remembered and a transient
+    AI failure is retried on the next request.
+    """
+    node_id = None
+    for applies, resolve in SEARCH_RESOLVERS:
+        if applies is None or applies(query_norm):
+            node_id = resolve(query_norm)
+            if node_id:
+                break
     
-    headers = {
-        'Content-Type': 'application/json',
+    node = nav_system.get_node(node_id) if node_id else None
+    if not node:
+        raise _SearchMiss(query_norm)
+    return node_id, node['name'], node.get('type', '')
+
+# Response headers shared by every invocation
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Cache-Control': 'no-cache, no-store, must-revalidate'
+}
+
+# Browser preflight answer; Max-Age lets the browser skip it for a day
+PREFLIGHT_RESPONSE = {
+    'statusCode': 204,
+    'headers': {
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'POST, OPTIONS',
         'Access-Control-Allow-Headers': 'Content-Type',
-        'Cache-Control': 'no-cache, no-store, must-revalidate'
-    }
-    
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': ''
+}
+
+def handler(request):
     if request.method == 'OPTIONS':
-        return {'statusCode': 200, 'headers': headers, 'body': ''}
+        return PREFLIGHT_RESPONSE
     
     try:
         body_str = request.body if hasattr(request, 'body') else ''
-        if isinstance(body_str, bytes):
-            body_str = body_str.decode('utf-8')
-        body = json.loads(body_str) if body_str else {}
+        body = orjson.loads(body_str) if body_str else {}
         query = body.get('query', '').strip()
-        search_type = body.get('type', 'destination')
         
         if not query:
             return {
                 'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({'success': False, 'error': 'Search query required'})
+                'headers': HEADERS,
+                'body': ERR_QUERY_REQUIRED
             }
         
-        node_id = None
-        if query.isdigit():
-            node_id = nav_system.find_node_by_room(query)
-        
-        if not node_id:
-            node_id = nav_system.find_node_by_name(query)
-        
-        if not node_id:
-            node_id = nav_system._match_location_with_ai(query, search_type)
-        
-        if node_id:
-            node = next((n for n in nav_system.nodes if n['id'] == node_id), None)
-            if node:
-                return {
-                    'statusCode': 200,
-                    'headers': headers,
-                    'body': json.dumps({
-                        'success': True,
-                        'node_id': node_id,
-                        'name': node['name'],
-                        'type': node.get('type', ''),
-                        'matched_via': 'direct' if node_id else 'ai'
-                    })
-                }
-        
+        node_id, name, node_type = _resolve_search(query.casefold())
+        return {
+            'statusCode': 200,
+            'headers': HEADERS,
+            'body': _body({
+                'success': True,
+                'node_id': node_id,
+                'name': name,
+                'type': node_type,
+                'matched_via': 'direct' if node_id else 'ai'
+            })
+        }
+    except _SearchMiss:
         return {
             'statusCode': 404,
-            'headers': headers,
-            'body': json.dumps({
+            'headers': HEADERS,
+            'body': _body({
                 'success': False,
                 'error': f'Could not find location matching "{query}". Try: Room numbers, Library, Cafeteria, etc.'
             })
@@ -78,7 +117,7 @@ def handler(request):
     except Exception as e:
         return {
             'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({'success': False, 'error': str(e)})
+            'headers': HEADERS,
+            'body': _body({'success': False, 'error': str(e)})
         }
 
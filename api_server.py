@@ -3,29 +3,98 @@ Flask API server for navigation system
 Connects Python pathfinding to web frontend
 """
 
-from flask import Flask, request, jsonify, send_file, Response
-from flask_cors import CORS
+from flask import Flask, request, send_file, Response
+from flask.json.provider import JSONProvider
 import os
+import gzip
+import hashlib
+import tempfile
+from functools import lru_cache
+from typing import Tuple
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from io import BytesIO
-from PIL import Image
+from PIL import Image, ImageOps
 from ai_navigation import AINavigationSystem
 
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):  # OSError: binding installed but libvips missing
+    PYVIPS_AVAILABLE = False
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, so request.json parses with orjson too"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+class ORJSONResponse(Response):
+    """JSON response serialized straight to bytes with orjson"""
+    default_mimetype = 'application/json'
+    
+    @classmethod
+    def make(cls, obj, status=200):
+        return cls(orjson.dumps(obj), status=status)
+
+
 app = Flask(__name__)
-# Allow all origins for CORS (including custom domain slcnavigation.aayussh.com)
-CORS(app, origins="*", allow_headers=["Content-Type"], methods=["GET", "POST", "OPTIONS"])
+app.json = ORJSONProvider(app)
+# Behind Apache mod_xsendfile (or nginx with X-Sendfile mapped to
+# X-Accel-Redirect) let the proxy stream cached files with sendfile(2)
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+# Answer every CORS preflight before routing; Max-Age lets the browser skip it for a day
+PREFLIGHT_HEADERS = {'Access-Control-Max-Age': '86400'}
+
+@app.before_request
+def preflight():
+    if request.method == 'OPTIONS':
+        return Response(status=204, headers=PREFLIGHT_HEADERS)
 
 # Disable caching for API responses
 @app.after_request
 def after_request(response):
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+    # Allow all origins for CORS (including custom domain slcnavigation.aayussh.com)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+    # Routes that set their own Cache-Control (destinations, images) keep it
+    if "Cache-Control" not in response.headers:
+        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
     return response
 
+# Constant error bodies, serialized once
+ERR_START_REQUIRED = orjson.dumps({'success': False, 'error': 'Start location required'})
+ERR_DESTINATION_REQUIRED = orjson.dumps({'success': False, 'error': 'Destination required'})
+ERR_LANDMARK_REQUIRED = orjson.dumps({'success': False, 'error': 'Landmark required'})
+ERR_QUERY_REQUIRED = orjson.dumps({'success': False, 'error': 'Search query required'})
+ERR_URL_REQUIRED = orjson.dumps({'success': False, 'error': 'URL parameter required'})
+
 # Initialize navigation system
 nav_system = AINavigationSystem('navigation_data.json')
 
+# Destinations only change with the data file, so serialize and compress once
+DESTINATIONS_JSON = orjson.dumps({'success': True, 'destinations': nav_system.get_available_destinations()})
+DESTINATIONS_GZIP = gzip.compress(DESTINATIONS_JSON, 9)
+DESTINATIONS_BR = brotli.compress(DESTINATIONS_JSON, quality=11) if BROTLI_AVAILABLE else None
+DESTINATIONS_ETAG = hashlib.blake2b(DESTINATIONS_JSON, digest_size=16).hexdigest()
+DESTINATIONS_CACHE_CONTROL = 'public, max-age=3600, stale-while-revalidate=86400'
+
 @app.route('/api/navigate', methods=['POST'])
 def navigate():
     """Navigate from start location to destination"""
@@ -35,24 +104,39 @@ def navigate():
     use_ai = data.get('use_ai', True)
     
     if not start_location:
-        return jsonify({'success': False, 'error': 'Start location required'}), 400
+        return ORJSONResponse(ERR_START_REQUIRED, status=400)
     if not destination:
-        return jsonify({'success': False, 'error': 'Destination required'}), 400
+        return ORJSONResponse(ERR_DESTINATION_REQUIRED, status=400)
     
     try:
         result = nav_system.navigate_from_to(start_location, destination, use_ai=use_ai)
-        return jsonify(result)
+        return ORJSONResponse.make(result)
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ORJSONResponse.make({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/destinations', methods=['GET'])
 def get_destinations():
-    """Get all available destinations"""
-    try:
-        destinations = nav_system.get_available_destinations()
-        return jsonify({'success': True, 'destinations': destinations})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    """Get all available destinations (precompressed when the client accepts it)"""
+    if request.if_none_match.contains_weak(DESTINATIONS_ETAG):
+        response = Response(status=304)
+        response.vary.add('Accept-Encoding')
+        response.set_etag(DESTINATIONS_ETAG, weak=True)
+        response.headers['Cache-Control'] = DESTINATIONS_CACHE_CONTROL
+        return response
+    
+    accepted = request.accept_encodings
+    if DESTINATIONS_BR is not None and accepted['br']:
+        response = ORJSONResponse(DESTINATIONS_BR)
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response = ORJSONResponse(DESTINATIONS_GZIP)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = ORJSONResponse(DESTINATIONS_JSON)
+    response.vary.add('Accept-Encoding')
+    response.set_etag(DESTINATIONS_ETAG, weak=True)
+    response.headers['Cache-Control'] = DESTINATIONS_CACHE_CONTROL
+    return response
 
 @app.route('/api/recover', methods=['POST'])
 def recover():
@@ -61,59 +145,177 @@ def recover():
     landmark = data.get('landmark', '')
     
     if not landmark:
-        return jsonify({'success': False, 'error': 'Landmark required'}), 400
+        return ORJSONResponse(ERR_LANDMARK_REQUIRED, status=400)
     
     try:
         result = nav_system.recover_from_landmark(landmark)
-        return jsonify(result)
+        return ORJSONResponse.make(result)
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ORJSONResponse.make({'success': False, 'error': str(e)}, 500)
+
+# Ordered (predicate, lookup) stages tried for a search query; first hit wins
+SEARCH_RESOLVERS = (
+    (str.isdigit, nav_system._room_to_id.get),
+    (None, nav_system.find_node_by_name),
+    (None, nav_system.trie_search),
+    (None, nav_system._ai_resolve_location),
+)
+
+class _SearchMiss(Exception):
+    """No location matched a search query"""
+
+@lru_cache(maxsize=4096)
+def _resolve_search(query_norm: str) -> Tuple[str, str, str]:
+    """
+    Resolve a normalized search query to (node_id, name, type)
+    
+    Raises _SearchMiss when nothing matches. lru_cache doesn't cache
+    exceptions, so only successful lookups are remembered and a transient
+    AI failure is retried on the next request.
+    """
+    node_id = None
+    for applies, resolve in SEARCH_RESOLVERS:
+        if applies is None or applies(query_norm):
+            node_id = resolve(query_norm)
+            if node_id:
+                break
+    
+    node = nav_system.get_node(node_id) if node_id else None
+    if not node:
+        raise _SearchMiss(query_norm)
+    return node_id, node['name'], node.get('type', '')
 
 @app.route('/api/search', methods=['POST'])
 def ai_search():
     """AI-based search - interpret natural language queries"""
     data = request.json
     query = data.get('query', '').strip()
-    search_type = data.get('type', 'destination')
     
     if not query:
-        return jsonify({'success': False, 'error': 'Search query required'}), 400
+        return ORJSONResponse(ERR_QUERY_REQUIRED, status=400)
     
     try:
-        node_id = None
-        if query.isdigit():
-            node_id = nav_system.find_node_by_room(query)
-        if not node_id:
-            node_id = nav_system.find_node_by_name(query)
-        if not node_id:
-            node_id = nav_system._match_location_with_ai(query, search_type)
-        
-        if node_id:
-            node = next((n for n in nav_system.nodes if n['id'] == node_id), None)
-            if node:
-                return jsonify({
-                    'success': True,
-                    'node_id': node_id,
-                    'name': node['name'],
-                    'type': node.get('type', ''),
-                    'matched_via': 'direct' if node_id else 'ai'
-                })
-        
-        return jsonify({
+        node_id, name, node_type = _resolve_search(query.casefold())
+        return ORJSONResponse.make({
+            'success': True,
+            'node_id': node_id,
+            'name': name,
+            'type': node_type,
+            'matched_via': 'direct' if node_id else 'ai'
+        })
+    except _SearchMiss:
+        return ORJSONResponse.make({
             'success': False,
             'error': f'Could not find location matching "{query}". Try: Room numbers, Library, Cafeteria, etc.'
-        }), 404
+        }, 404)
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ORJSONResponse.make({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check"""
-    return jsonify({
+    return ORJSONResponse.make({
         'status': 'ok',
         'ai_enabled': nav_system.ai_enabled
     })
 
+# Shared session so image fetches reuse keep-alive connections to Supabase
+IMAGE_SESSION = requests.Session()
+_image_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=2)
+IMAGE_SESSION.mount('https://', _image_adapter)
+IMAGE_SESSION.mount('http://', _image_adapter)
+IMAGE_SESSION.headers['User-Agent'] = 'SLC-Nav/1.0'
+
+# Converted WebP images are cached on local disk (/tmp persists across warm
+# serverless invocations); oldest entries are evicted past the size limit
+WEBP_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'webpcache')
+WEBP_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+def _webp_cache_path(image_url: str, quality: int, max_width: int) -> str:
+    """Content-addressed cache path for a conversion request"""
+    key = hashlib.blake2b(f"{image_url}|{quality}|{max_width}".encode(), digest_size=16).hexdigest()
+    return os.path.join(WEBP_CACHE_DIR, f"{key}.webp")
+
+def _evict_webp_cache():
+    """Delete the least recently written cache entries until under the size limit"""
+    entries = []
+    total = 0
+    with os.scandir(WEBP_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith('.webp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    
+    for _, size, path in sorted(entries):
+        if total <= WEBP_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def _store_webp(cache_path: str, data: bytes):
+    """Atomically add a converted image to the disk cache (best-effort)"""
+    tmp_name = None
+    try:
+        os.makedirs(WEBP_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=WEBP_CACHE_DIR, suffix='.tmp', delete=False) as tmp:
+            tmp_name = tmp.name
+            tmp.write(data)
+        os.replace(tmp_name, cache_path)
+        _evict_webp_cache()
+    except OSError:
+        # Eviction only counts *.webp, so a leftover .tmp would never be removed
+        if tmp_name is not None:
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+
+def _webp_with_vips(data: bytes, quality: int, max_width: int) -> bytes:
+    """Decode, shrink and WebP-encode in one streamed libvips pipeline"""
+    # Only width is constrained; size='down' never upscales
+    img = pyvips.Image.thumbnail_buffer(data, max_width, height=10_000_000, size='down')
+    if img.hasalpha():
+        img = img.flatten(background=[255, 255, 255])
+    return img.webpsave_buffer(Q=quality, effort=4)
+
+def _webp_with_pillow(stream, quality: int, max_width: int) -> bytes:
+    """Pillow fallback for when libvips isn't installed"""
+    img = Image.open(stream)
+    # Let libjpeg downscale by 1/2, 1/4 or 1/8 while decoding (no-op for
+    # other formats); only width is constrained, so the height bound is 1.
+    # EXIF orientations 5-8 swap the axes, so the output width is stored height
+    if img.getexif().get(0x0112) in (5, 6, 7, 8):
+        img.draft('RGB', (1, max_width))
+    else:
+        img.draft('RGB', (max_width, 1))
+    img.load()
+    # Apply the EXIF orientation, as libvips' thumbnail does
+    img = ImageOps.exif_transpose(img)
+    
+    # Convert RGBA to RGB if necessary (WebP supports both, but RGB is smaller)
+    if img.mode == 'RGBA':
+        # Create white background
+        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img.split()[3])  # Use alpha channel as mask
+        img = rgb_img
+    elif img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGB')
+    
+    # Resize if larger than max_width (maintain aspect ratio)
+    if img.width > max_width:
+        ratio = max_width / img.width
+        new_height = int(img.height * ratio)
+        img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+    
+    # Convert to WebP
+    webp_buffer = BytesIO()
+    img.save(webp_buffer, format='WEBP', quality=quality, method=4)
+    return webp_buffer.getvalue()
+
 @app.route('/api/image/webp', methods=['GET'])
 def convert_to_webp():
     """
@@ -127,39 +329,33 @@ def convert_to_webp():
     max_width = int(request.args.get('max_width', 1200))
     
     if not image_url:
-        return jsonify({'success': False, 'error': 'URL parameter required'}), 400
+        return ORJSONResponse(ERR_URL_REQUIRED, status=400)
     
+    cache_path = _webp_cache_path(image_url, quality, max_width)
     try:
-        # Fetch image from Supabase
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()
-        
-        # Open image with Pillow
-        img = Image.open(BytesIO(response.content))
-        
-        # Convert RGBA to RGB if necessary (WebP supports both, but RGB is smaller)
-        if img.mode == 'RGBA':
-            # Create white background
-            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])  # Use alpha channel as mask
-            img = rgb_img
-        elif img.mode not in ('RGB', 'RGBA'):
-            img = img.convert('RGB')
-        
-        # Resize if larger than max_width (maintain aspect ratio)
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Convert to WebP
-        webp_buffer = BytesIO()
-        img.save(webp_buffer, format='WEBP', quality=quality, method=6)
-        webp_buffer.seek(0)
+        return send_file(cache_path, mimetype='image/webp', max_age=31536000)
+    except OSError:
+        pass  # Not cached yet (or evicted); convert below
+    
+    try:
+        with IMAGE_SESSION.get(image_url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            if PYVIPS_AVAILABLE:
+                data = response.content
+                try:
+                    webp_bytes = _webp_with_vips(data, quality, max_width)
+                except pyvips.Error:
+                    # Formats or files libvips can't handle; Pillow may still decode them
+                    webp_bytes = _webp_with_pillow(BytesIO(data), quality, max_width)
+            else:
+                # Stream the body straight into Pillow
+                response.raw.decode_content = True
+                webp_bytes = _webp_with_pillow(response.raw, quality, max_width)
+        _store_webp(cache_path, webp_bytes)
         
         # Return WebP image with proper caching
         return Response(
-            webp_buffer.getvalue(),
+            webp_bytes,
             mimetype='image/webp',
             headers={
                 'Cache-Control': 'public, max-age=31536000',  # Cache for 1 year
@@ -168,9 +364,9 @@ def convert_to_webp():
         )
         
     except requests.RequestException as e:
-        return jsonify({'success': False, 'error': f'Failed to fetch image: {str(e)}'}), 500
+        return ORJSONResponse.make({'success': False, 'error': f'Failed to fetch image: {str(e)}'}, 500)
     except Exception as e:
-        return jsonify({'success': False, 'error': f'Failed to convert image: {str(e)}'}), 500
+        return ORJSONResponse.make({'success': False, 'error': f'Failed to convert image: {str(e)}'}, 500)
 
 
 if __name__ == '__main__':
@@ -178,7 +374,8 @@ if __name__ == '__main__':
     # Disable Flask's automatic dotenv loading to avoid permission errors
     import flask.cli
     flask.cli.load_dotenv = lambda *args, **kwargs: None
-    app.run(debug=False, host='0.0.0.0', port=port)
+    # Threaded so a slow image fetch or AI call doesn't block other requests
+    app.run(debug=False, host='0.0.0.0', port=port, threaded=True, processes=1)
 
 
 
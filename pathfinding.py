@@ -3,117 +3,299 @@ Navigation Pathfinding System
 Implements BFS (Breadth-First Search) and DFS (Depth-First Search)
 """
 
+import os
+import sys
 import json
-from collections import deque
+import mmap
+import pickle
+from array import array
+from functools import cached_property, lru_cache
 from typing import List, Dict, Optional, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _parse_json_file(json_file_path: str) -> Dict:
+    """Parse a JSON file, memory-mapping it for orjson to avoid an extra read copy"""
+    with open(json_file_path, 'rb') as f:
+        if not ORJSON_AVAILABLE:
+            return json.load(f)
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped; let orjson report the error
+            return orjson.loads(f.read())
+        with mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+# NavigationSystem attributes persisted in the <json>.pkl index cache; bump
+# the version whenever this set or how any of them is built changes
+_INDEX_CACHE_VERSION = 1
+_INDEX_CACHE_ATTRS = (
+    'nodes', 'start_node', 'graph', '_idx_to_id', '_id_to_idx', '_indptr', '_indices',
+    '_nodes_by_id', '_room_to_id', '_name_to_id', '_name_normalized', '_normalized_keys'
+)
+
+
+def _load_index_cache(json_file_path: str) -> Optional[Dict]:
+    """
+    Return the pickled, fully built navigation index (<json>.pkl) when it is
+    at least as new as the JSON file and matches the current cache version
+    """
+    cache_path = json_file_path + '.pkl'
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(json_file_path):
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if isinstance(cached, dict) and cached.get('version') == _INDEX_CACHE_VERSION:
+                attrs = cached['attrs']
+                if isinstance(attrs, dict) and attrs.keys() == set(_INDEX_CACHE_ATTRS):
+                    return attrs
+    except Exception:
+        # Best-effort: any unreadable or incompatible cache is just rebuilt
+        pass
+    return None
+
+
+def _store_index_cache(json_file_path: str, attrs: Dict):
+    """Write the built index next to the JSON file (best-effort)"""
+    cache_path = json_file_path + '.pkl'
+    # Write atomically; read-only deployments (e.g. Vercel) just skip the cache
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': _INDEX_CACHE_VERSION, 'attrs': attrs}, f, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _bfs_parents_kernel(indptr, indices, start, end, visited, queue, parents):
+    """CSR BFS for numba; fills parents up to end and reports whether end was reached"""
+    visited[start] = 1
+    queue[0] = start
+    head, tail = 0, 1
+    while head < tail:
+        current = queue[head]
+        head += 1
+        for k in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[k]
+            if neighbor == end:
+                parents[end] = current
+                return True
+            if visited[neighbor] == 0:
+                visited[neighbor] = 1
+                parents[neighbor] = current
+                queue[tail] = neighbor
+                tail += 1
+    return False
+
+
+@lru_cache(maxsize=None)
+def _compiled_bfs():
+    """
+    Import numba and compile _bfs_parents_kernel on first use. Returns a
+    bfs(indptr, indices, start, end) -> parents-or-None function, or None
+    when numpy/numba aren't installed
+    """
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        return None
+    
+    try:
+        kernel = njit(cache=True)(_bfs_parents_kernel)
+    except RuntimeError:
+        # No writable cache location (read-only deployments); compile per process
+        kernel = njit(_bfs_parents_kernel)
+    
+    def bfs(indptr, indices, start, end):
+        # Zero-copy int32 views of the CSR arrays
+        indptr = np.frombuffer(indptr, dtype=np.int32)
+        indices = np.frombuffer(indices, dtype=np.int32)
+        node_count = indptr.shape[0] - 1
+        parents = np.full(node_count, -1, np.int32)
+        visited = np.zeros(node_count, np.uint8)
+        queue = np.empty(node_count, np.int32)
+        if kernel(indptr, indices, start, end, visited, queue, parents):
+            return parents
+        return None
+    
+    return bfs
+
+
+# The numba BFS is opt-in (NAV_NUMBA_BFS=1): importing numba and JIT-compiling
+# cost far more than plain BFS saves on campus-sized graphs, so it is only
+# used for graphs at least NUMBA_MIN_NODES large
+NUMBA_BFS_ENABLED = os.environ.get('NAV_NUMBA_BFS', '').lower() in ('1', 'true', 'yes')
+NUMBA_MIN_NODES = 20000
+
+# Graphs at least this large route through bidirectional BFS; smaller ones keep
+# plain BFS so existing routes (and their equal-length tie-breaks) don't change
+BIDIRECTIONAL_MIN_NODES = 1000
+
+# Common punctuation and spaces dropped when normalizing names
+_NORMALIZE_TABLE = str.maketrans('', '', "'.- _")
+
+
+def _normalize(s: str) -> str:
+    """Normalize a name for matching: lowercase, remove punctuation and spaces"""
+    return s.lower().strip().translate(_NORMALIZE_TABLE)
+
 
 class NavigationSystem:
     def __init__(self, json_file_path: str):
         """Initialize navigation system from JSON file"""
-        with open(json_file_path, 'r') as f:
-            data = json.load(f)
+        # Reuse the pickled graph and indices when they are current; otherwise
+        # parse the JSON, build everything and refresh the cache
+        cached = _load_index_cache(json_file_path)
+        if cached is not None:
+            self.__dict__.update(cached)
+        else:
+            data = _parse_json_file(json_file_path)
+            
+            self.nodes = data['nodes']
+            self.start_node = data['start_node']
+            self._intern_ids()
+            self.graph = self._build_graph()
+            self._build_int_graph()
+            self._nodes_by_id = {n['id']: n for n in self.nodes}
+            self._build_indices()
+            _store_index_cache(json_file_path, {name: getattr(self, name) for name in _INDEX_CACHE_ATTRS})
         
-        self.nodes = data['nodes']
-        self.start_node = data['start_node']
-        self.graph = self._build_graph()
+        self._numba_bfs = None
+        if NUMBA_BFS_ENABLED and len(self._idx_to_id) >= NUMBA_MIN_NODES:
+            self._numba_bfs = _compiled_bfs()
+        # Per-instance path cache; the graph never changes after load, and the
+        # start node is part of the key, so recovery needs no invalidation
+        self._compute_path = lru_cache(maxsize=1024)(self._find_path)
+        # Repeated free-text queries skip the partial-match scan; keyed on the
+        # normalized form so case/punctuation variants share an entry
+        self._partial_name_match = lru_cache(maxsize=256)(self._match_partial_name)
     
-    def _build_graph(self) -> Dict[str, List[str]]:
-        """Build adjacency list graph from nodes (bidirectional connections)"""
-        graph = {}
-        
-        # Initialize all nodes
+    def _intern_ids(self):
+        """Intern node IDs and references so every copy of an ID is one object (identity-fast dict hits)"""
         for node in self.nodes:
-            graph[node['id']] = []
+            node['id'] = sys.intern(node['id'])
+            node['connects_to'] = [sys.intern(connected_id) for connected_id in node['connects_to']]
+        self.start_node = sys.intern(self.start_node)
+    
+    def _build_graph(self) -> Dict[str, Tuple[str, ...]]:
+        """Build adjacency list graph from nodes (bidirectional connections)"""
+        # Dicts act as insertion-ordered sets: O(1) dedupe while keeping the
+        # neighbor order (and so BFS/DFS tie-breaking) of the JSON file
+        graph = {node['id']: {} for node in self.nodes}
         
         # Add connections (bidirectional)
         for node in self.nodes:
             for connected_id in node['connects_to']:
-                if connected_id not in graph[node['id']]:
-                    graph[node['id']].append(connected_id)
+                graph[node['id']][connected_id] = None
                 # Make it bidirectional
-                if node['id'] not in graph[connected_id]:
-                    graph[connected_id].append(node['id'])
+                graph[connected_id][node['id']] = None
         
-        return graph
+        # Freeze to tuples for traversal
+        return {node_id: tuple(neighbors) for node_id, neighbors in graph.items()}
+    
+    def _build_int_graph(self):
+        """
+        Mirror self.graph as CSR arrays over dense int indices: the neighbors
+        of node u are _indices[_indptr[u]:_indptr[u + 1]], in file order
+        """
+        self._idx_to_id = list(self.graph)
+        self._id_to_idx = {node_id: i for i, node_id in enumerate(self._idx_to_id)}
+        self._indptr = array('i', [0])
+        self._indices = array('i')
+        for node_id in self._idx_to_id:
+            self._indices.extend(self._id_to_idx[neighbor] for neighbor in self.graph[node_id])
+            self._indptr.append(len(self._indices))
+    
+    def _build_indices(self):
+        """Precompute room and name lookup indices (first node wins, matching scan order)"""
+        self._room_to_id = {}
+        self._name_to_id = {}
+        self._name_normalized = {}
+        # (id, normalized name, normalized id, normalized aliases) for partial matching
+        self._normalized_keys = []
+        
+        for node in self.nodes:
+            node_id = node['id']
+            for room in node.get('rooms', []):
+                self._room_to_id.setdefault(sys.intern(room), node_id)
+            
+            aliases = node.get('aliases', [])
+            for key in (node['name'], node_id, *aliases):
+                self._name_to_id.setdefault(sys.intern(key.lower().strip()), node_id)
+                self._name_normalized.setdefault(sys.intern(_normalize(key)), node_id)
+            
+            self._normalized_keys.append((
+                node_id,
+                _normalize(node['name']),
+                _normalize(node_id),
+                tuple(_normalize(alias) for alias in aliases)
+            ))
     
     def find_node_by_room(self, room_number: str) -> Optional[str]:
         """Find node ID that contains the given room number"""
-        for node in self.nodes:
-            if room_number in node['rooms']:
-                return node['id']
-        return None
+        return self._room_to_id.get(room_number)
     
     def find_node_by_name(self, name: str) -> Optional[str]:
         """Find node ID by name (case-insensitive, handles variations)"""
-        # Normalize search string: lowercase, remove punctuation and spaces
-        def normalize(s: str) -> str:
-            s = s.lower().strip()
-            # Remove common punctuation and spaces
-            for char in ["'", ".", "-", " ", "_"]:
-                s = s.replace(char, "")
-            return s
+        # First try exact match (case insensitive, original), then normalized exact match
+        node_id = self._name_to_id.get(name.lower().strip())
+        if node_id:
+            return node_id
         
-        search_name = normalize(name)
+        search_name = _normalize(name)
+        node_id = self._name_normalized.get(search_name)
+        if node_id:
+            return node_id
         
-        # First try exact match (case insensitive, original)
-        for node in self.nodes:
-            if node['name'].lower().strip() == name.lower().strip():
-                return node['id']
-            if node['id'].lower() == name.lower().strip():
-                return node['id']
-            
-            # Check aliases if they exist
-            if 'aliases' in node:
-                for alias in node['aliases']:
-                    if alias.lower().strip() == name.lower().strip():
-                        return node['id']
-        
-        # Then try normalized exact match
-        for node in self.nodes:
-            node_name_normalized = normalize(node['name'])
-            node_id_normalized = normalize(node['id'])
-            if node_name_normalized == search_name or node_id_normalized == search_name:
-                return node['id']
-            
-            # Check aliases with normalization
-            if 'aliases' in node:
-                for alias in node['aliases']:
-                    if normalize(alias) == search_name:
-                        return node['id']
-        
-        # Try partial match (normalized) - search in node name
-        for node in self.nodes:
-            node_name_normalized = normalize(node['name'])
-            node_id_normalized = normalize(node['id'])
-            if (search_name in node_name_normalized or 
-                search_name in node_id_normalized):
-                return node['id']
+        return self._partial_name_match(search_name)
+    
+    def _match_partial_name(self, search_name: str) -> Optional[str]:
+        """Partial-match scan behind the _partial_name_match cache (search_name is normalized)"""
+        # Single scan for the partial tiers: the first forward partial match
+        # (search in node name) wins outright; otherwise the first reverse
+        # partial match (node name in search, for abbreviations) is used
+        allow_reverse = len(search_name) >= 4  # Only for meaningful searches
+        reverse_match = None
+        for node_id, name_n, id_n, aliases_n in self._normalized_keys:
+            if search_name in name_n or search_name in id_n:
+                return node_id
             
             # Check aliases for partial match
-            if 'aliases' in node:
-                for alias in node['aliases']:
-                    alias_normalized = normalize(alias)
-                    if search_name in alias_normalized or alias_normalized in search_name:
-                        return node['id']
-        
-        # Try reverse partial match - node name in search (for abbreviations)
-        if len(search_name) >= 4:  # Only for meaningful searches
-            for node in self.nodes:
-                node_name_normalized = normalize(node['name'])
-                node_id_normalized = normalize(node['id'])
-                if (node_name_normalized in search_name or 
-                    node_id_normalized in search_name):
-                    return node['id']
-                
-                # Check aliases for reverse partial match
-                if 'aliases' in node:
-                    for alias in node['aliases']:
-                        alias_normalized = normalize(alias)
-                        if alias_normalized in search_name or search_name in alias_normalized:
-                            return node['id']
+            for alias_n in aliases_n:
+                if search_name in alias_n or alias_n in search_name:
+                    return node_id
+            
+            if (allow_reverse and reverse_match is None and
+                    (name_n in search_name or id_n in search_name)):
+                reverse_match = node_id
         
-        return None
+        return reverse_match
+    
+    def _resolve_destination(self, query: str) -> Optional[str]:
+        """Resolve a room number or location name to a node ID (room index first, then names)"""
+        return self._room_to_id.get(query) or self.find_node_by_name(query)
+    
+    def _path_from_parents(self, parents, end: int) -> List[str]:
+        """Walk parent pointers (-1 at the start) back from end and return the node IDs in order"""
+        path = []
+        current = end
+        while current != -1:
+            path.append(self._idx_to_id[current])
+            current = parents[current]
+        path.reverse()
+        return path
     
     def find_path_bfs(self, start_id: str, end_id: str) -> Optional[List[str]]:
         """
@@ -123,24 +305,44 @@ class NavigationSystem:
         if start_id == end_id:
             return [start_id]
         
-        # Queue stores paths: [(path1), (path2), ...]
-        queue = deque([[start_id]])
-        visited = {start_id}
+        start = self._id_to_idx.get(start_id)
+        end = self._id_to_idx.get(end_id)
+        if start is None or end is None:
+            return None
         
-        while queue:
-            path = queue.popleft()
-            current = path[-1]
-            
-            # Get neighbors
-            neighbors = self.graph.get(current, [])
+        if self._numba_bfs is not None:
+            parents = self._numba_bfs(self._indptr, self._indices, start, end)
+            if parents is None:
+                return None
+            return self._path_from_parents(parents, end)
+        
+        # Queue is a preallocated array with head/tail cursors (each node is
+        # enqueued at most once, so node_count slots suffice); visited is a
+        # byte per node and parents records how each node was reached
+        indptr, indices = self._indptr, self._indices
+        node_count = len(self._idx_to_id)
+        visited = bytearray(node_count)
+        visited[start] = 1
+        parents = array('i', [-1]) * node_count
+        queue = array('i', [0]) * node_count
+        queue[0] = start
+        head, tail = 0, 1
+        
+        while head < tail:
+            current = queue[head]
+            head += 1
             
-            for neighbor in neighbors:
-                if neighbor == end_id:
-                    return path + [neighbor]
+            for k in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[k]
+                if neighbor == end:
+                    parents[end] = current
+                    return self._path_from_parents(parents, end)
                 
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(path + [neighbor])
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    parents[neighbor] = current
+                    queue[tail] = neighbor
+                    tail += 1
         
         return None  # No path found
     
@@ -152,29 +354,101 @@ class NavigationSystem:
         if start_id == end_id:
             return [start_id]
         
-        visited = set()
-        path = []
+        start = self._id_to_idx.get(start_id)
+        end = self._id_to_idx.get(end_id)
+        if start is None or end is None:
+            return None
         
-        def dfs(current: str) -> bool:
-            if current == end_id:
-                return True
+        # Explicit stack of (node, neighbor iterator) frames instead of recursion;
+        # parents records how each node was reached, as in BFS
+        indptr, indices = self._indptr, self._indices
+        node_count = len(self._idx_to_id)
+        visited = bytearray(node_count)
+        visited[start] = 1
+        parents = array('i', [-1]) * node_count
+        stack = [(start, iter(indices[indptr[start]:indptr[start + 1]]))]
+        
+        while stack:
+            current, neighbors = stack[-1]
+            neighbor = next(neighbors, None)
+            if neighbor is None:
+                stack.pop()
+            elif neighbor == end:
+                parents[end] = current
+                return self._path_from_parents(parents, end)
+            elif not visited[neighbor]:
+                visited[neighbor] = 1
+                parents[neighbor] = current
+                stack.append((neighbor, iter(indices[indptr[neighbor]:indptr[neighbor + 1]])))
+        
+        return None
+    
+    def find_path_bidirectional(self, start_id: str, end_id: str) -> Optional[List[str]]:
+        """
+        Bidirectional BFS - shortest path, searching from both ends at once
+        Expands whichever frontier is smaller one full layer at a time and
+        stops at the first layer where the two searches meet
+        """
+        if start_id == end_id:
+            return [start_id]
+        
+        start = self._id_to_idx.get(start_id)
+        end = self._id_to_idx.get(end_id)
+        if start is None or end is None:
+            return None
+        
+        indptr, indices = self._indptr, self._indices
+        node_count = len(self._idx_to_id)
+        # Index 0 is the search from start, 1 the search from end
+        parents = (array('i', [-1]) * node_count, array('i', [-1]) * node_count)
+        depth = (array('i', [-1]) * node_count, array('i', [-1]) * node_count)
+        depth[0][start] = 0
+        depth[1][end] = 0
+        frontiers = [[start], [end]]
+        
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            own_parents, own_depth, other_depth = parents[side], depth[side], depth[1 - side]
             
-            visited.add(current)
-            path.append(current)
+            # Finish the whole layer so the shortest of its meeting edges wins
+            meeting = None
+            meeting_length = 0
+            next_frontier = []
+            for current in frontiers[side]:
+                for k in range(indptr[current], indptr[current + 1]):
+                    neighbor = indices[k]
+                    if other_depth[neighbor] != -1:
+                        length = own_depth[current] + 1 + other_depth[neighbor]
+                        if meeting is None or length < meeting_length:
+                            meeting = (current, neighbor)
+                            meeting_length = length
+                    if own_depth[neighbor] == -1:
+                        own_depth[neighbor] = own_depth[current] + 1
+                        own_parents[neighbor] = current
+                        next_frontier.append(neighbor)
             
-            neighbors = self.graph.get(current, [])
-            for neighbor in neighbors:
-                if neighbor not in visited:
-                    if dfs(neighbor):
-                        return True
+            if meeting:
+                # Splice: start ... forward_node -> backward_node ... end
+                forward_node, backward_node = meeting if side == 0 else meeting[::-1]
+                path = self._path_from_parents(parents[0], forward_node)
+                while backward_node != -1:
+                    path.append(self._idx_to_id[backward_node])
+                    backward_node = parents[1][backward_node]
+                return path
             
-            path.pop()
-            return False
+            frontiers[side] = next_frontier
         
-        if dfs(start_id):
-            return path + [end_id]
-        
-        return None
+        return None  # No path found
+    
+    def _find_path(self, start_id: str, end_id: str, use_dfs: bool = False) -> Optional[Tuple[str, ...]]:
+        """Path search behind the _compute_path cache (tuples so cached paths can't be mutated)"""
+        if use_dfs:
+            path = self.find_path_dfs(start_id, end_id)
+        elif len(self._idx_to_id) >= BIDIRECTIONAL_MIN_NODES:
+            path = self.find_path_bidirectional(start_id, end_id)
+        else:
+            path = self.find_path_bfs(start_id, end_id)
+        return tuple(path) if path else None
     
     def navigate(self, destination: str, use_dfs: bool = False) -> Dict:
         """
@@ -188,15 +462,8 @@ class NavigationSystem:
         Returns:
             Dictionary with path information
         """
-        destination_id = None
         start_id = self.start_node
-        
-        # Check if destination is a room number
-        destination_id = self.find_node_by_room(destination)
-        
-        # If not a room, try finding by name
-        if not destination_id:
-            destination_id = self.find_node_by_name(destination)
+        destination_id = self._resolve_destination(destination)
         
         if not destination_id:
             return {
@@ -205,8 +472,7 @@ class NavigationSystem:
             }
         
         # Find path
-        path = (self.find_path_dfs(start_id, destination_id) if use_dfs 
-                else self.find_path_bfs(start_id, destination_id))
+        path = self._compute_path(start_id, destination_id, use_dfs)
         
         if not path:
             return {
@@ -214,20 +480,17 @@ class NavigationSystem:
                 'error': f'No path found to {destination}'
             }
         
-        # Get full node details for path
-        path_nodes = []
-        for node_id in path:
-            node = next((n for n in self.nodes if n['id'] == node_id), None)
-            if node:
-                path_nodes.append(node)
+        path = list(path)
         
+        # Get full node details for path
+        path_nodes = [self._nodes_by_id[node_id] for node_id in path]
         return {
             'success': True,
             'path': path,
             'path_nodes': path_nodes,
             'photos': [node['photo'] for node in path_nodes],
-            'start': next((n for n in self.nodes if n['id'] == start_id), None),
-            'destination': next((n for n in self.nodes if n['id'] == destination_id), None)
+            'start': self._nodes_by_id[start_id],
+            'destination': self._nodes_by_id[destination_id]
         }
     
     def recover_from_landmark(self, landmark_name: str) -> Dict:
@@ -245,7 +508,7 @@ class NavigationSystem:
         
         # Update start node to the landmark
         self.start_node = landmark_id
-        landmark_node = next((n for n in self.nodes if n['id'] == landmark_id), None)
+        landmark_node = self._nodes_by_id[landmark_id]
         
         return {
             'success': True,
@@ -254,6 +517,13 @@ class NavigationSystem:
     
     def get_available_destinations(self) -> List[Dict]:
         """Get all available destinations (rooms and landmarks)"""
+        # Nodes never change after load, so the list is built once; callers get
+        # their own copies of the entries, so mutating one can't leak into later calls
+        return [dict(destination) for destination in self._destinations]
+    
+    @cached_property
+    def _destinations(self) -> List[Dict]:
+        """Destination list behind get_available_destinations, built on first use"""
         destinations = []
         
         for node in self.nodes:
@@ -0,0 +1,49 @@
+"""
+Regression checks for local fuzzy location matching
+Run with pytest, or directly: python3 test_fuzzy_matching.py
+"""
+
+from ai_navigation import AINavigationSystem, RAPIDFUZZ_AVAILABLE
+
+
+def _make_nav():
+    nav = AINavigationSystem('navigation_data.json')
+    nav.ai_enabled = False  # Only local matching; no network calls
+    return nav
+
+
+def _destination_id(nav, destination):
+    result = nav.navigate_from_to('Main Entrance', destination, use_ai=True)
+    return result['destination']['id'] if result['success'] else None
+
+
+def test_print_requests_never_go_to_fitness_hallway():
+    nav = _make_nav()
+    for query in ("I need to print", "where to print"):
+        assert _destination_id(nav, query) in (None, 'library'), query
+
+
+def test_room_numbers_skip_fuzzy_matching():
+    nav = _make_nav()
+    assert nav._fuzzy_match_location("Room 12010") is None
+    assert _destination_id(nav, "Room 12010") != 'basement_big_hall'
+
+
+def test_vague_phrases_are_not_guessed():
+    nav = _make_nav()
+    assert _destination_id(nav, "second floor") != 'tan_wing'
+
+
+def test_typos_still_match():
+    if not RAPIDFUZZ_AVAILABLE:
+        return
+    nav = _make_nav()
+    assert nav._fuzzy_match_location("student asociation") == nav.find_node_by_name("Student Association")
+    assert nav._fuzzy_match_location("upper concorse") == nav.find_node_by_name("Upper Concourse")
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith('test_') and callable(check):
+            check()
+            print(f"✓ {name}")
@@ -0,0 +1,81 @@
+"""
+Regression checks for bidirectional BFS on a synthetic graph large enough
+to reach BIDIRECTIONAL_MIN_NODES
+Run with pytest, or directly: python3 test_pathfinding.py
+"""
+
+import json
+import os
+import random
+import tempfile
+
+from pathfinding import NavigationSystem, BIDIRECTIONAL_MIN_NODES
+
+
+def _make_large_nav(node_count=BIDIRECTIONAL_MIN_NODES + 200, seed=7):
+    """Sparse random graph plus a small disconnected island"""
+    rng = random.Random(seed)
+    ids = [f"n{i}" for i in range(node_count)]
+    connects = {node_id: set() for node_id in ids}
+    # Random spanning tree over most nodes, then extra edges to create cycles
+    main = ids[:-5]
+    for i in range(1, len(main)):
+        connects[main[i]].add(main[rng.randrange(i)])
+    for _ in range(node_count // 2):
+        a, b = rng.sample(main, 2)
+        connects[a].add(b)
+    # Island: reachable among themselves only
+    island = ids[-5:]
+    for a, b in zip(island, island[1:]):
+        connects[a].add(b)
+
+    nodes = [
+        {
+            'id': node_id, 'name': f"Node {node_id}", 'photo': '', 'type': 'hallway',
+            'floor': 1, 'connects_to': sorted(connects[node_id]), 'rooms': [], 'description': ''
+        }
+        for node_id in ids
+    ]
+    tmp_dir = tempfile.mkdtemp()
+    json_path = os.path.join(tmp_dir, 'navigation_data.json')
+    with open(json_path, 'w') as f:
+        json.dump({'nodes': nodes, 'start_node': ids[0]}, f)
+    return NavigationSystem(json_path), ids, rng
+
+
+def _assert_valid_path(nav, path, start_id, end_id):
+    assert path[0] == start_id and path[-1] == end_id
+    for a, b in zip(path, path[1:]):
+        assert b in nav.graph[a], (a, b)
+
+
+def test_bidirectional_matches_bfs_lengths():
+    nav, ids, rng = _make_large_nav()
+    assert len(ids) >= BIDIRECTIONAL_MIN_NODES
+    main = ids[:-5]
+    pairs = [tuple(rng.sample(main, 2)) for _ in range(300)]
+    pairs += [(main[0], main[0]), (main[0], ids[-1]), (ids[-1], ids[-3])]
+    for start_id, end_id in pairs:
+        expected = nav.find_path_bfs(start_id, end_id)
+        path = nav.find_path_bidirectional(start_id, end_id)
+        if expected is None:
+            assert path is None, (start_id, end_id)
+            continue
+        assert path is not None, (start_id, end_id)
+        assert len(path) == len(expected), (start_id, end_id)
+        _assert_valid_path(nav, path, start_id, end_id)
+
+
+def test_large_graphs_route_through_bidirectional():
+    nav, ids, _ = _make_large_nav()
+    result = nav.navigate(f"Node {ids[-200]}")
+    assert result['success']
+    assert len(result['path']) == len(nav.find_path_bfs(ids[0], ids[-200]))
+    _assert_valid_path(nav, result['path'], ids[0], ids[-200])
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith('test_') and callable(check):
+            check()
+            print(f"✓ {name}")